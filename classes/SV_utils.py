@@ -1,22 +1,80 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import asyncio
 import socket
 import datetime
-import sys
+import operator
 import os
+import time
 import logging
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.worksheet.dimensions import ColumnDimension, DimensionHolder
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import PatternFill, Font, Alignment
-import pandas as pd
+
+# aiohttp and xlsxwriter are imported lazily where they are used, so an
+# ad-hoc run_command user does not pay their import cost at startup
+
+
+class SVError(Exception):
+    """
+    Base error of SV_system, exit_code maps to the tool return codes
+    """
+    exit_code = 1
+
+
+class SVWriteError(SVError):
+    exit_code = 2
+
+
+class SVCommandError(SVError):
+    exit_code = 3
+
+
+class SVAuthError(SVError):
+    exit_code = 4
+
+
+class SVPermError(SVError):
+    exit_code = 5
+
+
+class SVConnError(SVError):
+    exit_code = 6
+
+# Display label to lssystem reply key, in the order they show on the sheet
+_LSSYSTEM_FIELDS = (
+    ("Product name", "product_name"),
+    ("Product model", "name"),
+    ("Serial", "id"),
+    ("Code level", "code_level"),
+    ("Console IP", "console_IP"),
+    ("Contact organization", "email_organization"),
+    ("Contact name", "email_contact"),
+    ("Contact email", "email_reply"),
+    ("Contact phone", "email_contact_primary"),
+    ("Auth service", "auth_service_configured"),
+    ("Auth service type", "auth_service_type"),
+    ("Callhome", "enhanced_callhome"),
+    ("Callhome censor", "censor_callhome"),
+    # ("Quorum lease", "quorum_lease"),
+    ("Copy rate", "relationship_bandwidth_limit"),
+    ("Local raw capacity", "total_drive_raw_capacity"),
+    ("Physical total", "physical_capacity"),
+    ("Physical free", "physical_free_capacity"),
+    ("Easy tier", "easy_tier_acceleration"),
+    # ("NAS key", "has_nas_key"),
+    ("Compression", "compression_active"),
+    ("Compressed virtual", "compression_virtual_capacity"),
+    ("Compressed capacity", "compression_compressed_capacity"),
+    ("Uncompressed capacity", "compression_uncompressed_capacity"),
+    ("Deduplication savings", "deduplication_capacity_saving"),
+    ("Cache prefetch", "cache_prefetch"))
+_LSSYSTEM_LABELS, _LSSYSTEM_KEYS = zip(*_LSSYSTEM_FIELDS)
+_LSSYSTEM_GETTER = operator.itemgetter(*_LSSYSTEM_KEYS)
+
 
 class SV_system(object):
     """
         RESTful client for Spectrum Virtualize API
 
-        __init__(self, IP, username, password, output_dir = "./output/", verbose = False)
+        __init__(self, IP, username, password, output_dir = "./output/", verbose = False, token = None)
         
         It allows to call commands via API run_command("command")
 
@@ -26,8 +84,19 @@ class SV_system(object):
     # We need this to silent self signed certs, not good from security point of view
     requests.packages.urllib3.disable_warnings()
 
+    # This is not an exact map to reality as some commands
+    # can be run by specific user that will fail here
+    _COPY_PREFIXES = ("start", "stop", "prestart", "prestop")
+    _ADMIN_PREFIXES = ("add", "ch", "mk", "rm")
+    _ADMIN_EXACT = frozenset({"expandvdisksize", "movevdisk"})
+    _COPY_ROLES = frozenset({"Administrator", "SecurityAdmin", "CopyOperator"})
+    _ADMIN_ROLES = frozenset({"Administrator", "SecurityAdmin"})
+
+    # How long a cached token file is considered worth probing, in seconds
+    _TOKEN_MAX_AGE = 600
 
-    def __init__(self, IP, username, password, output_dir = "./output/", verbose = False):
+
+    def __init__(self, IP, username, password, output_dir = "./output/", verbose = False, token = None):
         self.IP = IP
         self.port = "7443"
         self.base_url = "https://" + self.IP + ":" + self.port + "/rest/"
@@ -39,9 +108,35 @@ class SV_system(object):
         self.master_file = self.output_dir + 'SVCheck_' + self.IP + '_' + self.timestamp + '.xlsx'
         self.log_file = self.output_dir +  'SVCheck_' + self.IP + '_' + self.timestamp + '.log'
         self.SVC_log = self.__set_logger_up()
-        self.token_id = self.__get_token()
+        # One session for all the calls so HTTP keep-alive saves us
+        # one TCP+TLS handshake per command
+        # verify=False travels with every post call because environment
+        # merging (REQUESTS_CA_BUNDLE and friends) overrides the session
+        # level setting and would break the self signed certs we target
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        # ls* queries are read only so we can dedupe repeats for the
+        # lifetime of this instance
+        self._cmd_cache = {}
+        # Resolve the API address once and remember a good probe so
+        # __check_connection does not redo DNS or the TCP handshake
+        try:
+            self._sockaddr = socket.getaddrinfo(self.IP, int(self.port),
+                                        socket.AF_INET, socket.SOCK_STREAM)[0][-1]
+        except socket.gaierror:
+            self.SVC_log.error("API port %s cannot be reached for %s", self.port, self.IP)
+            raise SVConnError("API port " + self.port + " cannot be reached for " + self.IP)
+        self._conn_verified = False
+        # Reusing a still valid token (passed in or cached on disk from a
+        # previous run) saves the auth round trip in scripted usage, the
+        # file is keyed by user so runs as different users never mix
+        self.token_file = self.output_dir + '.svctoken_' + self.IP + '_' + self.username
+        self.token_id = self.__resolve_token(token)
+        self.session.headers.update({'X-Auth-Token': self.token_id})
         self.user_role = self.__get_user_role()
-        self.first_run = True
+        # The workbook is created lazily by generate_excel_report so a
+        # run_command only user never touches xlsxwriter
+        self.wb = None
         self._report_commands = [
                                 "lssystem",
                                 "lsnode",
@@ -69,81 +164,155 @@ class SV_system(object):
         
         It returns a list of dictionaries or a dictionary depending of the command issued
         """
-        self.__check_connection()
+        if command.startswith("ls") and command in self._cmd_cache:
+            self.SVC_log.debug("Returning cached reply for command %s", command)
+            return self._cmd_cache[command]
         has_right = self.__check_user_rights(command)
-        command_headers = {'X-Auth-Token': self.token_id}
         command_url = self.base_url + command
-        self.SVC_log.debug("Going to send command run " + command + " to API")
-        cmd_r = requests.post(command_url, headers=command_headers, verify=False)
+        self.SVC_log.debug("Going to send command run %s to API", command)
+        # No preflight socket probe here, __init__ already checked the
+        # port once and the POST itself tells us if the API went away
+        try:
+            cmd_r = self.session.post(command_url, verify=False)
+        except (requests.ConnectionError, requests.Timeout):
+            self.SVC_log.error("API port %s cannot be reached for %s", self.port, self.IP)
+            raise SVConnError("API port " + self.port + " cannot be reached for " + self.IP)
         if cmd_r.status_code == 200:
-            cmd_d = json.loads(cmd_r.text)
-            self.SVC_log.debug("Got HTTP 200 on command run " + command + " to API")
+            cmd_d = cmd_r.json()
+            self.SVC_log.debug("Got HTTP 200 on command run %s to API", command)
+            if command.startswith("ls"):
+                self._cmd_cache[command] = cmd_d
             return cmd_d
         else:
             if has_right: # Might be a valid command and we fail
-                self.SVC_log.error("Cannot run " + command + " to API")
-                sys.exit(3)
+                self.SVC_log.error("Cannot run %s to API", command)
+                raise SVCommandError("Cannot run " + command + " to API")
             else:
-                self.SVC_log.error("Cannot run " + command + " to API, likely is not a correct command")
-                sys.exit(3)
+                self.SVC_log.error("Cannot run %s to API, likely is not a correct command", command)
+                raise SVCommandError("Cannot run " + command + " to API, likely is not a correct command")
 
 
     def generate_excel_report(self):
         """
         Generates the Excel report
         """
-        # Generate sheets from list of commands
-        for command in self._report_commands:
-            self.__parse_command_to_excel(command)
-        self.SVC_log.info("Succesfully generated " + self.master_file + " report")
+        self.__create_workbook()
+        # Fetch the command outputs concurrently and write each sheet
+        # as soon as its data lands, overlapping network and Excel work
+        try:
+            asyncio.run(self._pipeline())
+        except BaseException:
+            # A failed run must still close the workbook or
+            # constant_memory mode leaks its temp files
+            try:
+                self.wb.close()
+            except BaseException:
+                pass
+            raise
+        # We save the whole workbook only once, at the very end
+        self.__save_excel()
+        self.SVC_log.info("Succesfully generated %s report", self.master_file)
+
+
+    async def _pipeline(self):
+        """
+        Fetches all the report commands from the API concurrently and
+        streams each reply through a queue to the Excel writer, so the
+        network waits overlap with the sheet writes
+        """
+        import aiohttp
+
+        self.SVC_log.debug("Going to fetch all report commands concurrently from %s", self.IP)
+        queue = asyncio.Queue(maxsize=4)
+        connector = aiohttp.TCPConnector(ssl=False, limit=8)
+        fetch_headers = {'X-Auth-Token': self.token_id}
+        async with aiohttp.ClientSession(connector=connector, headers=fetch_headers) as session:
+
+            async def fetch_one(command):
+                self.SVC_log.debug("Going to send command run %s to API", command)
+                # Same connection error mapping as the sync run_command
+                try:
+                    async with session.post(self.base_url + command) as cmd_r:
+                        if cmd_r.status == 200:
+                            self.SVC_log.debug("Got HTTP 200 on command run %s to API", command)
+                            await queue.put((command, await cmd_r.json(content_type=None)))
+                        else:
+                            self.SVC_log.error("Cannot run %s to API", command)
+                            raise SVCommandError("Cannot run " + command + " to API")
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    self.SVC_log.error("API port %s cannot be reached for %s", self.port, self.IP)
+                    raise SVConnError("API port " + self.port + " cannot be reached for " + self.IP)
+
+            async def write_all():
+                # Single consumer so the workbook only ever sees one
+                # writer at a time
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    command, cmd_data = item
+                    await asyncio.to_thread(self.__parse_command_to_excel, command, cmd_data)
+
+            writer = asyncio.ensure_future(write_all())
+            fetchers = asyncio.gather(*[fetch_one(command) for command in self._report_commands])
+            # If the writer dies early the bounded queue would fill up
+            # and block every fetcher forever, so cancel them with it
+            writer.add_done_callback(lambda _writer: fetchers.cancel())
+            try:
+                await fetchers
+            except asyncio.CancelledError:
+                pass
+            finally:
+                if not writer.done():
+                    await queue.put(None)
+                # Raises here if the writer failed
+                await writer
+        self.SVC_log.debug("Completed fetching all report commands from %s", self.IP)
+
+
+    def close(self):
+        """
+        Closes the session and the connections it keeps alive
+        """
+        self.session.close()
+
+
+    def invalidate_cache(self):
+        """
+        Drops the cached ls* replies so the next calls hit the API again
+        """
+        self._cmd_cache = {}
 
 
     def __get_user_role(self):
-        self.SVC_log.debug("Going to query role of " + self.username)
+        self.SVC_log.debug("Going to query role of %s", self.username)
         current_user = self.run_command("lscurrentuser")
         current_user_role = current_user[1]["role"]
-        self.SVC_log.debug("Got role of " + self.username + " is " + current_user_role)
+        self.SVC_log.debug("Got role of %s is %s", self.username, current_user_role)
         return current_user_role
 
 
     def __check_user_rights(self, command):
-        # This is not an exact map to reality as some commands 
-        # can be run by specific user that will fail here
-        CopyOperator_roles = ["Administrator", "SecurityAdmin", "CopyOperator", "SecurityAdmin"]
-        Admin_roles = ["Administrator", "SecurityAdmin", "SecurityAdmin"]
-        self.SVC_log.debug("Checking user " + self.username + " has appropiate role for command " + command)
+        self.SVC_log.debug("Checking user %s has appropiate role for command %s", self.username, command)
         if command.startswith("ls"):
-            self.SVC_log.debug("All groups can run " + command)
+            self.SVC_log.debug("All groups can run %s", command)
             return True
-        elif(
-            command.startswith("start") or 
-            command.startswith("stop") or
-            command.startswith("prestart") or
-            command.startswith("prestop")
-        ):
-
-            if self.user_role in CopyOperator_roles:
-                self.SVC_log.debug("Group " + self.user_role + " can run " + command)
+        elif command.startswith(self._COPY_PREFIXES):
+            if self.user_role in self._COPY_ROLES:
+                self.SVC_log.debug("Group %s can run %s", self.user_role, command)
                 return True
             else:
-                self.SVC_log.error("Group " + self.user_role + " cannot run " + command)
-                sys.exit(5)
-        elif(
-            command.startswith("add") or
-            command.startswith("ch") or
-            command == "expandvdisksize" or
-            command.startswith("mk") or
-            command == "movevdisk" or
-            command.startswith("rm")
-        ):
-            if self.user_role in Admin_roles:
-                self.SVC_log.debug("Group " + self.user_role + " can run " + command)
+                self.SVC_log.error("Group %s cannot run %s", self.user_role, command)
+                raise SVPermError("Group " + self.user_role + " cannot run " + command)
+        elif command.startswith(self._ADMIN_PREFIXES) or command in self._ADMIN_EXACT:
+            if self.user_role in self._ADMIN_ROLES:
+                self.SVC_log.debug("Group %s can run %s", self.user_role, command)
                 return True
             else:
-                self.SVC_log.error("Group " + self.user_role + " cannot run " + command)
-                sys.exit(5)
+                self.SVC_log.error("Group %s cannot run %s", self.user_role, command)
+                raise SVPermError("Group " + self.user_role + " cannot run " + command)
         else: # Maybe not a valid command
-            self.SVC_log.debug("Cannot match command " + command + " with any know command")
+            self.SVC_log.debug("Cannot match command %s with any know command", command)
             return False
             
 
@@ -154,8 +323,10 @@ class SV_system(object):
                 os.makedirs(self.output_dir)
                 return True
             except BaseException:
-                sys.exit(self.__add_timestamp() + ": Cannot create " + self.output_dir)
-        
+                # This runs before the log is open, self.timestamp is
+                # already computed so no need to format a fresh one
+                raise SVError(self.IP + "_" + self.timestamp + ": Cannot create " + self.output_dir)
+
 
     def __set_logger_up(self):
         self.__create_output_dir()
@@ -176,26 +347,83 @@ class SV_system(object):
         return SVC_log
 
 
-    def __add_timestamp(self):
-        # We only use this for errors before the log is open
-        time_now = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        return self.IP + "_" + time_now
-
-
     def __check_connection(self):
+        # One good probe is enough, the session keeps the connection alive
+        if self._conn_verified:
+            return
         sv_api_check = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sv_api_check.settimeout(2.0)
-        location = (self.IP, int(self.port))
-        self.SVC_log.debug("Starting check access to API port " + self.IP + ":" + self.port)
-        open_port = sv_api_check.connect_ex(location)
+        self.SVC_log.debug("Starting check access to API port %s:%s", self.IP, self.port)
+        open_port = sv_api_check.connect_ex(self._sockaddr)
         sv_api_check.shutdown(socket.SHUT_RDWR)
         sv_api_check.close()
-        
+
         if open_port != 0:
-            self.SVC_log.error("API port " + self.port + " cannot be reached for " + self.IP)    
-            sys.exit(6)
+            self.SVC_log.error("API port %s cannot be reached for %s", self.port, self.IP)
+            raise SVConnError("API port " + self.port + " cannot be reached for " + self.IP)
         else:
-            self.SVC_log.debug("Completed check access to API port "  + self.IP + ":" + self.port)
+            self._conn_verified = True
+            self.SVC_log.debug("Completed check access to API port %s:%s", self.IP, self.port)
+
+
+    def __resolve_token(self, token):
+        if token is not None and self.__check_token(token):
+            return token
+        cached_token = self.__read_cached_token()
+        if cached_token is not None and self.__check_token(cached_token):
+            return cached_token
+        new_token = self.__get_token()
+        self.__write_cached_token(new_token)
+        return new_token
+
+
+    def __check_token(self, token):
+        # lscurrentuser is readable by every role so it makes a cheap probe
+        try:
+            probe_r = self.session.post(self.base_url + 'lscurrentuser',
+                                        headers={'X-Auth-Token': token}, verify=False)
+        except (requests.ConnectionError, requests.Timeout):
+            self.SVC_log.error("API port %s cannot be reached for %s", self.port, self.IP)
+            raise SVConnError("API port " + self.port + " cannot be reached for " + self.IP)
+        if probe_r.status_code == 200:
+            # The token must belong to the user we were asked to run as,
+            # otherwise the report would carry another identity
+            try:
+                probe_name = probe_r.json()[0]["name"]
+            except (ValueError, LookupError):
+                self.SVC_log.debug("Cannot read the user name while probing token for %s", self.IP)
+                return False
+            if probe_name == self.username:
+                self.SVC_log.info("Reusing still valid auth token for %s", self.IP)
+                return True
+            self.SVC_log.debug("Auth token for %s belongs to %s, not %s",
+                                self.IP, probe_name, self.username)
+            return False
+        self.SVC_log.debug("Auth token for %s is no longer valid", self.IP)
+        return False
+
+
+    def __read_cached_token(self):
+        try:
+            if time.time() - os.path.getmtime(self.token_file) < self._TOKEN_MAX_AGE:
+                with open(self.token_file) as cached:
+                    return cached.read().strip()
+        except OSError:
+            pass
+        return None
+
+
+    def __write_cached_token(self, token):
+        # Write then rename so a parallel run never reads half a token,
+        # mode 0600 so other local users cannot read a live token
+        tmp_file = self.token_file + '.tmp'
+        try:
+            cached_fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(cached_fd, 'w') as cached:
+                cached.write(token)
+            os.replace(tmp_file, self.token_file)
+        except OSError:
+            self.SVC_log.debug("Cannot cache auth token under %s", self.output_dir)
 
 
     def __get_token(self):
@@ -203,151 +431,99 @@ class SV_system(object):
         # We need to encode utf-8 here at least for non ASCII passwords
         token_headers = {'X-Auth-Username': self.username, 'X-Auth-Password': self.password, 'charset': 'utf-8'}
         auth_url = self.base_url + 'auth'
-        self.SVC_log.debug("Getting auth token from " + self.IP)
-        token_r = requests.post(auth_url, headers=token_headers, verify=False)
+        self.SVC_log.debug("Getting auth token from %s", self.IP)
+        token_r = self.session.post(auth_url, headers=token_headers, verify=False)
         if token_r.status_code == 200:
-            token_d = json.loads(token_r.text)
-            self.SVC_log.info("Got valid auth token from " + self.IP)
+            token_d = token_r.json()
+            self.SVC_log.info("Got valid auth token from %s", self.IP)
             return token_d['token']
         else:
             self.SVC_log.error("Cannot get auth token with these credentials")
-            sys.exit(4)
+            raise SVAuthError("Cannot get auth token with these credentials")
 
 
-    def __format_lssystem_to_excel(self):
-        
-        lssystem = self.run_command("lssystem")
-        lssystem_data = []
-        lssystem_data.append({
-                        "Product name": lssystem['product_name'],
-                        "Product model": lssystem['name'],
-                        "Serial": lssystem['id'],
-                        "Code level": lssystem['code_level'],
-                        "Console IP": lssystem['console_IP'],
-                        "Contact organization": lssystem['email_organization'],
-                        "Contact name": lssystem['email_contact'],
-                        "Contact email": lssystem['email_reply'],
-                        "Contact phone": lssystem['email_contact_primary'],
-                        "Auth service": lssystem['auth_service_configured'],
-                        "Auth service type": lssystem['auth_service_type'],
-                        "Callhome": lssystem['enhanced_callhome'],
-                        "Callhome censor": lssystem['censor_callhome'],
-                        # "Quorum lease": lssystem['quorum_lease'],
-                        "Copy rate": lssystem['relationship_bandwidth_limit'],
-                        "Local raw capacity": lssystem['total_drive_raw_capacity'],
-                        "Physical total": lssystem['physical_capacity'],
-                        "Physical free": lssystem['physical_free_capacity'],
-                        "Easy tier": lssystem['easy_tier_acceleration'],
-                        # "NAS key": lssystem['has_nas_key'],
-                        "Compression": lssystem['compression_active'],
-                        "Compressed virtual": lssystem['compression_virtual_capacity'],
-                        "Compressed capacity": lssystem['compression_compressed_capacity'],
-                        "Uncompressed capacity": lssystem['compression_uncompressed_capacity'],
-                        "Deduplication savings": lssystem['deduplication_capacity_saving'],
-                        "Cache prefetch": lssystem['cache_prefetch']
-                        })
+    def __format_lssystem_to_excel(self, lssystem):
+
+        lssystem_row = dict(zip(_LSSYSTEM_LABELS, _LSSYSTEM_GETTER(lssystem)))
         # Different models / levels report different tiers
         for tier in lssystem['tiers']:
-            tier_key_total = tier['tier']+"_total"
-            tier_key_free = tier['tier']+"_free"
-            lssystem_data[0].update({tier_key_total: tier['tier_capacity']})
-            lssystem_data[0].update({tier_key_free: tier['tier_free_capacity']})
-        return lssystem_data
+            lssystem_row[tier['tier'] + "_total"] = tier['tier_capacity']
+            lssystem_row[tier['tier'] + "_free"] = tier['tier_free_capacity']
+        return [lssystem_row]
+
+
+    def __create_workbook(self):
+        import xlsxwriter
+
+        # We only ever write the report, constant_memory streams the
+        # rows to disk and keeps the memory flat whatever the size
+        self.wb = xlsxwriter.Workbook(self.master_file,
+                                    {'constant_memory': True, 'strings_to_numbers': False})
+        # Formats are registered once on the workbook and shared by all sheets
+        self.header_format = self.wb.add_format({'font_name': 'Calibri',
+                                                'font_size': 12,
+                                                'bold': True,
+                                                'font_color': '#000000',
+                                                'fg_color': '#0066CC',
+                                                'pattern': 9,
+                                                'align': 'center',
+                                                'valign': 'vcenter'})
+        self.even_row_format = self.wb.add_format({'fg_color': '#66cc00',
+                                                'pattern': 9,
+                                                'align': 'center',
+                                                'valign': 'vcenter'})
+        self.odd_row_format = self.wb.add_format({'fg_color': '#b3ff66',
+                                                'pattern': 15,
+                                                'align': 'center',
+                                                'valign': 'vcenter'})
+        # Create the sheets up front so they keep the report command
+        # order no matter in which order the fetches complete
+        for command in self._report_commands:
+            self.wb.add_worksheet(command)
 
 
-    def __parse_command_to_excel(self, command):
+    def __parse_command_to_excel(self, command, cmd_data):
 
-        if self.first_run:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = command
-            self.first_run = False
-        else:
-            wb = load_workbook(self.master_file)
-            wb.create_sheet(command)
-            ws = wb[command]
-        self.SVC_log.debug("Gathering " + command + " information from " + self.IP)
+        ws = self.wb.get_worksheet_by_name(command)
         if command == "lssystem":
-            cmd_list = self.__format_lssystem_to_excel()
+            cmd_list = self.__format_lssystem_to_excel(cmd_data)
         else:
-            cmd_list = self.run_command(command)
-        self.SVC_log.debug("Completed gathering " + command + " information from " + self.IP)
+            cmd_list = cmd_data
 
-        self.SVC_log.debug("Loading " + command + " information on Pandas dataframe")
-        df = pd.DataFrame.from_dict(cmd_list)
-        self.SVC_log.debug("Loaded " + command + " information on Pandas dataframe")
+        # The API already replies a list of dictionaries so we stream
+        # it straight into the sheet, no dataframe round trip needed
+        headers = list(cmd_list[0].keys()) if cmd_list else []
 
-        #self.SVC_log.info("Creating " + command + " information into Excel file")
+        self.__format_sheet(ws, command, len(headers))
 
         # Import the data to sheet
-        self.SVC_log.debug("Starting loading " + command + " information into Excel file")
-        for r in dataframe_to_rows(df, index=False, header=True):
-            ws.append(r)
+        self.SVC_log.debug("Starting loading %s information into Excel file", command)
+        ws.write_row(0, 0, headers, self.header_format)
 
-        self.SVC_log.debug("Completed loading " + command + " information into Excel file")
+        # Local bindings keep attribute lookups out of the row loop,
+        # which adds up on big sheets like lseventlog
+        write_row = ws.write_row
+        row_formats = (self.even_row_format, self.odd_row_format)
+        for the_row, row in enumerate(cmd_list, 2):
+            write_row(the_row - 1, 0, (row.get(header) for header in headers), row_formats[the_row % 2])
 
-        #self.SVC_log.info("Completed creating " + command + " information into Excel file")
-        
-        self.__format_sheet(ws, command)
+        self.SVC_log.debug("Completed loading %s information into Excel file", command)
 
-        self.__save_excel(wb, command)
 
+    def __format_sheet(self, ws, command, num_columns):
+        # Fix the width
+        self.SVC_log.debug("Starting fixing width for %s sheet", command)
+        if num_columns > 0:
+            ws.set_column(0, num_columns - 1, 25)
+        self.SVC_log.debug("Completed fixing width for %s sheet", command)
 
-    def __format_sheet(self, ws, command):      
-        self.SVC_log.debug("Starting formating " + command + " information into Excel file")
 
-        # Fix the width
-        self.SVC_log.debug("Starting fixing width for " + command + " sheet")
-        dim_holder = DimensionHolder(worksheet=ws)
-
-        for the_col in range(ws.min_column, ws.max_column + 1):
-            dim_holder[get_column_letter(the_col)] = ColumnDimension(ws, min=the_col, max=the_col, width=25)
-            ws.column_dimensions = dim_holder
-        self.SVC_log.debug("Completed fixing width for " + command + " sheet")
-
-        # Set the header
-        self.SVC_log.debug("Starting setting header for " + command + " sheet")
-        HEADER_FONT = Font(name='Calibri',
-                        size=12,
-                        bold=True,
-                        italic=False,
-                        vertAlign=None,
-                        underline='none',
-                        strike=False,
-                        color='000000')
-        for the_col in range(ws.min_column, ws.max_column + 1):
-            ws.cell(row=1, column=the_col).font = HEADER_FONT
-            ws.cell(row=1, column=the_col).fill = PatternFill(start_color='0066CC', end_color='0066CC', fill_type = 'darkGrid')
-        self.SVC_log.debug("Completed setting header for " + command + " sheet")
-
-        # Center all
-        self.SVC_log.debug("Starting centering cells for " + command + " sheet")
-        for row_cells in ws.iter_rows():
-            for cell in row_cells:
-                cell.alignment = Alignment(horizontal='center',
-                                            vertical='center')
-        self.SVC_log.debug("Completed centering cells for " + command + " sheet")
-
-        # Create alternate colors
-        self.SVC_log.debug("Starting coloring alternate rows for " + command + " sheet")
-        for the_row in range(2, ws.max_row + 1, 2):
-            for the_col in range(1, ws.max_column + 1):
-                ws.cell(row=the_row, column=the_col).fill = PatternFill(start_color='66cc00', end_color='66cc00', fill_type = 'darkGrid')
-
-        for the_row in range(3, ws.max_row + 1, 2):
-            for the_col in range(1, ws.max_column + 1):
-                ws.cell(row=the_row, column=the_col).fill = PatternFill(start_color='b3ff66', end_color='b3ff66', fill_type = 'lightGrid')
-        self.SVC_log.debug("Completed coloring alternate rows for " + command + " sheet")
-
-        self.SVC_log.debug("Completed formating " + command + " information into Excel file")
-
-
-    def __save_excel(self, wb, command):
+    def __save_excel(self):
         # Save and close
-        self.SVC_log.debug("Starting saving " + command + " information into Excel file")
+        self.SVC_log.debug("Starting saving report into Excel file")
         try:
-            wb.save(self.master_file)
+            self.wb.close()
         except BaseException:
-            self.SVC_log.error("Cannot write " + self.master_file)
-            sys.exit(2)
-        self.SVC_log.info("Completed saving " + command + " information into Excel file")
+            self.SVC_log.error("Cannot write %s", self.master_file)
+            raise SVWriteError("Cannot write " + self.master_file)
+        self.SVC_log.info("Completed saving report into Excel file")